@@ -1,36 +1,85 @@
 from binance import Client
+import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from secret import KEY, SECRET
 
+log = logging.getLogger(__name__)
+
+
+def _interval_to_timedelta(interval: str):
+    # Binance intervals look like '1s', '15m', '4h', '1d', '1w' or '1M'
+    amount, unit = int(interval[:-1]), interval[-1]
+    if unit == 'M':
+        return pd.Timedelta(days=31 * amount)
+    return pd.Timedelta(amount, unit={'s': 's', 'm': 'min', 'h': 'h', 'd': 'D', 'w': 'W'}[unit])
+
+
+def _to_naive_utc(value):
+    # Saved timestamps are naive UTC, so timezone aware dates are converted before comparing
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
+
+@lru_cache(maxsize=32)
+def _read(path: Path, mtime_ns: int):
+    # Keyed on the modification time, so a file rewritten or replaced on disk is read again
+    # Parquet keeps the column types, so a reload has the same NumPy dtypes as a fresh download
+    return pd.read_parquet(path, engine='pyarrow')
+
+
+def _load(path: Path, start: str, end: str, interval: str):
+    # Return already existing file if its timeframe matches, otherwise None
+    if not path.exists():
+        return None
+
+    log.info('File already exists.')
+    data = _read(path, path.stat().st_mtime_ns)
+    # Check if timeframe match
+    # Klines are aligned to the interval, so the first and last ones can be up to one interval off
+    first, last = _to_naive_utc(data['Timestamp'].iloc[0]), _to_naive_utc(data['Timestamp'].iloc[-1])
+    try:
+        tolerance = _interval_to_timedelta(interval)
+        start, end = _to_naive_utc(start), _to_naive_utc(end)
+    except (KeyError, ValueError, TypeError):
+        # Relative dates like '1 day ago UTC' or unknown intervals can't be compared, so download again
+        log.info('Timeframe does not match.')
+        return None
+    if (abs(first - start) < tolerance) and (abs(last - end) < tolerance):
+        log.info('Timeframe ok. \nReturning already existing file.')
+        return data
+
+    log.info('Timeframe does not match.')
+    return None
+
 
 def get_and_preprocess_data(binance_client: Client,
                             start: str,
-                            end: str = datetime.today().strftime('%Y-%m-%d'),
+                            end: str = None,
                             symbol: str = 'BTCUSDT',
                             interval: str = Client.KLINE_INTERVAL_1DAY,
                             save: bool = True,
                             dir: str = 'data'):
+    # Default is evaluated per call so it doesn't go stale in a long running process
+    end = end or datetime.today().strftime('%Y-%m-%d')
+
     # Path to save file
-    from pathlib import Path
     dir = Path(dir)
-    filename = f'{symbol}_{interval}_data.csv'
+    filename = f'{symbol}_{interval}_data.parquet'
     path = dir / filename
 
-    # Check if file already exists
-    if path.exists():
-        print('File already exists.')
-        data = pd.read_csv(path)
-        # Check if timeframe match
-        if (data['Timestamp'].iloc[0] == start) and (data['Timestamp'].iloc[-1] == end):
-            print('Timeframe ok. \nReturning already existing file.')
-            # Return already existing file
-            return data
-        # Download new file
-        else:
-            print('Timeframe does not match.')
-
-    print('Downloading data...')
+    # Check if file already exists (parsed files are kept in memory between calls)
+    data = _load(path, start, end, interval)
+    if data is not None:
+        # Copy so the caller can't modify the cached DataFrame
+        return data.copy()
+
+    log.info('Downloading data...')
 
     # Binance Key and Secret
     client = binance_client
@@ -40,23 +89,20 @@ def get_and_preprocess_data(binance_client: Client,
                                         interval=interval,
                                         start_str=start,
                                         end_str=end)
-    # Convert to DataFrame
-    data = pd.DataFrame(data)
-
-    # Rename columns
-    data.columns = ['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close Time', 'Quote Asset Volume',
-                    'Number of Trades', 'TB Base Volume', 'TB Quote Volume', 'Ignore']
-
-    # Pick the columns
-    data = data[['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    # Kline columns: Timestamp, Open, High, Low, Close, Volume, Close Time, Quote Asset Volume,
+    # Number of Trades, TB Base Volume, TB Quote Volume, Ignore
+    klines = np.asarray(data, dtype=object)
 
-    # Fix datatypes
-    data.loc[:, 'Timestamp'] = pd.to_datetime(data['Timestamp']/1000, unit='s')
-    data[data.columns[1:]] = data[data.columns[1:]].apply(
-        pd.to_numeric, axis='columns')
+    # Build the DataFrame from the picked columns, each converted straight to its datatype
+    data = pd.DataFrame({'Timestamp': pd.to_datetime(klines[:, 0].astype('int64'), unit='ms'),
+                         'Open': klines[:, 1].astype(np.float32),
+                         'High': klines[:, 2].astype(np.float32),
+                         'Low': klines[:, 3].astype(np.float32),
+                         'Close': klines[:, 4].astype(np.float32),
+                         'Volume': klines[:, 5].astype(np.float32)})
 
-    # Save to csv
-    if save == True:
-        data.to_csv(path, index=False)
+    # Save to parquet
+    if save:
+        data.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
 
     return data
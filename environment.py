@@ -1,256 +1,368 @@
+import logging
+import math
 import numpy as np
-from enum import Enum
+from enum import IntEnum
+from numba import njit
 
+# Transactions are logged at DEBUG, enable with logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
 
-class PositionType(Enum):
+
+class PositionType(IntEnum):
     LONG = 1
     HOLD = 0
     SHORT = -1
 
 
+# Position types as plain ints for the step hot path
+LONG = PositionType.LONG.value
+HOLD = PositionType.HOLD.value
+SHORT = PositionType.SHORT.value
+
+# Columns of the price history and where the Open price is in them
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+OPEN_COLUMN = PRICE_COLUMNS.index('Open')
+
+# Outcomes of a step, returned by _step_core
+ZERO_VOLUME = 0
+HELD = 1
+OPENED = 2
+BOUGHT_MORE = 3
+SOLD_SOME = 4
+SOLD_ALL = 5
+REVERSED = 6
+STOP_LOSS = 7
+LAST_STEP = 8
+
+# [agent action + 1, type of open position + 1] -> what to do
+OPEN, BUY_MORE, SELL, DO_NOTHING = 0, 1, 2, 3
+_DISPATCH = np.array([
+    # position SHORT, HOLD, LONG
+    [BUY_MORE, OPEN, SELL],  # action SHORT
+    [DO_NOTHING, DO_NOTHING, DO_NOTHING],  # action HOLD
+    [SELL, OPEN, BUY_MORE],  # action LONG
+], dtype=np.int8)
+
+
+@njit(cache=True, fastmath=True)
+def _portfolio_value(position_type, owned_volume, purchase_price, current_price):
+    # LONG (1) earns when current_price goes up: current_price * owned_volume
+    # SHORT (-1) earns when current_price goes down: (2 * purchase_price - current_price) * owned_volume
+    # HOLD (0) has no open position, so owned_volume is 0
+    return owned_volume * (purchase_price + position_type * (current_price - purchase_price))
+
+
+@njit(cache=True, fastmath=True)
+def _cost_volume(balance, volume, current_price, transaction_fee):
+    # Buy as much as you can if you can't afford all volume
+    if balance < volume * current_price + transaction_fee:
+        # Floor of the quotient like the C and torch kernels, // can buy one unit less near exact multiples
+        volume = float(math.floor((balance - transaction_fee) / current_price))
+    return volume * current_price, volume
+
+
+@njit(cache=True, fastmath=True)
+def _step_core(balance, position_type, owned_volume, purchase_price, portfolio_value,
+               action, volume, current_price, transaction_fee, last_step):
+    # Numeric core of TradingEnvironment.step, shared with VecTradingEnvironment
+    # Returns the new (balance, position_type, owned_volume, purchase_price, portfolio_value,
+    # action, outcome), where action is what was actually done
+    # Volume can not be 0
+    if volume == 0 and action != HOLD:
+        return balance, position_type, owned_volume, purchase_price, portfolio_value, HOLD, ZERO_VOLUME
+
+    portfolio_value = _portfolio_value(position_type, owned_volume, purchase_price, current_price)
+
+    # Stop loss check and last iteration both sell everything
+    # The usual case, money left, short-circuits after the cheap balance test
+    stop_loss = not (balance > 0 and portfolio_value + balance > 0)
+    if stop_loss or last_step:
+        if position_type != HOLD:
+            action = -position_type
+            balance += portfolio_value - transaction_fee
+            position_type = HOLD
+            owned_volume = 0.0
+            purchase_price = 0.0
+        # Everything is sold, so there is nothing left to value
+        portfolio_value = 0.0
+        outcome = STOP_LOSS if stop_loss else LAST_STEP
+        return balance, position_type, owned_volume, purchase_price, portfolio_value, action, outcome
+
+    outcome = HELD
+    branch = _DISPATCH[action + 1, position_type + 1]
+    if branch == DO_NOTHING:
+        pass
+    elif branch == OPEN:
+        # Open new position
+        cost, volume = _cost_volume(balance, volume, current_price, transaction_fee)
+        if cost == 0:
+            action = HOLD
+        else:
+            balance -= cost + transaction_fee
+            position_type = action
+            owned_volume = volume
+            purchase_price = current_price
+            outcome = OPENED
+    elif branch == BUY_MORE:
+        # Buy more
+        cost, volume = _cost_volume(balance, volume, current_price, transaction_fee)
+        if cost == 0:
+            action = HOLD
+        else:
+            balance -= cost + transaction_fee
+            new_volume = owned_volume + volume
+            purchase_price = (purchase_price * owned_volume + current_price * volume) / new_volume
+            owned_volume = new_volume
+            outcome = BOUGHT_MORE
+    else:  # branch == SELL
+        if owned_volume > volume:
+            # Sell some, position type and purchase price stay the same
+            balance += portfolio_value * volume / owned_volume
+            owned_volume -= volume
+            outcome = SOLD_SOME
+        else:
+            # Sell all
+            balance += portfolio_value
+            remaining_volume = volume - owned_volume
+            position_type = HOLD
+            owned_volume = 0.0
+            purchase_price = 0.0
+            outcome = SOLD_ALL
+            # Open reverse if there is some remaining volume
+            if remaining_volume > 0:
+                cost, remaining_volume = _cost_volume(balance, remaining_volume, current_price, transaction_fee)
+                if cost == 0:
+                    action = HOLD
+                else:
+                    # The reverse is part of the same trade, the fee below is charged once for both
+                    balance -= cost
+                    position_type = action
+                    owned_volume = remaining_volume
+                    purchase_price = current_price
+                    outcome = REVERSED
+        # Pay transaction fee
+        balance -= transaction_fee
+
+    # Update portfolio value again
+    portfolio_value = _portfolio_value(position_type, owned_volume, purchase_price, current_price)
+    return balance, position_type, owned_volume, purchase_price, portfolio_value, action, outcome
+
+
+# Explicit signature so _run_episode is compiled (or loaded from cache) on import, not on first call
+_STATE = 'Tuple((f8, i8, f8, f8, f8))'
+
+
+@njit(f'Tuple((f8[:], f8[:], i1[:], {_STATE}, i8, i8, b1))'
+      f'(f8[::1], i1[::1], f8[::1], {_STATE}, i8, f8, f8[::1], f8[::1], i1[::1])',
+      cache=True, fastmath=True)
+def _run_episode(open_prices, actions, volumes, state, current_step, transaction_fee,
+                 history_balance, history_portfolio, history_action):
+    # Steps _step_core through a sequence of actions until they run out or the game is over
+    # state is (balance, position_type, owned_volume, purchase_price, portfolio_value)
+    # Each taken step is also written to the history arrays at its index
+    balance, position_type, owned_volume, purchase_price, portfolio_value = state
+    # Views from the current step on, so prices and history are indexed by steps taken
+    # and their bounds are known before the loop
+    prices = open_prices[current_step:]
+    step_balance = history_balance[current_step:len(open_prices)]
+    step_portfolio = history_portfolio[current_step:len(open_prices)]
+    step_action = history_action[current_step:len(open_prices)]
+    last_step = len(prices) - 1
+
+    n = len(actions)
+    balance_history = np.empty(n)
+    portfolio_history = np.empty(n)
+    action_history = np.empty(n, dtype=np.int8)
+    # Steps taken, and the step whose prices the last state was computed from, -1 if none was taken
+    taken = 0
+    state_step = -1
+    game_over = False
+    i = 0
+    while i < n and not game_over:
+        (balance, position_type, owned_volume, purchase_price, portfolio_value, action, outcome) = _step_core(
+            balance, position_type, owned_volume, purchase_price, portfolio_value,
+            actions[i], volumes[i], prices[taken], transaction_fee, taken == last_step)
+        balance_history[i] = balance
+        portfolio_history[i] = portfolio_value
+        action_history[i] = action
+        i += 1
+        if outcome != ZERO_VOLUME:
+            step_balance[taken] = balance
+            step_portfolio[taken] = portfolio_value
+            step_action[taken] = action
+            state_step = taken
+            game_over = outcome >= STOP_LOSS
+            if not game_over:
+                taken += 1
+
+    state = (balance, position_type, owned_volume, purchase_price, portfolio_value)
+    if state_step >= 0:
+        state_step += current_step
+    return (balance_history[:i], portfolio_history[:i], action_history[:i],
+            state, current_step + taken, state_step, game_over)
+
+
 class TradingEnvironment:
-    def __init__(self, data, initial_balance, transaction_fee):
-        self.data = data
+    # Fixed attribute layout, step reads and writes most of these
+    __slots__ = ('_prices', '_n', '_open', 'initial_balance', 'transaction_fee', 'verbose', '_position_types',
+                 'current_step', 'balance', 'current_state', 'portfolio_value',
+                 'position_type', 'owned_volume', 'purchase_price', 'action',
+                 'history_balance', 'history_portfolio', 'history_action')
+
+    def __init__(self, data, initial_balance, transaction_fee, verbose=False):
+        # Price history as a contiguous float32 matrix, so steps don't go through pandas indexing
+        # The DataFrame itself is not kept
+        self._prices = np.ascontiguousarray(
+            data[PRICE_COLUMNS].to_numpy(np.float32))
+        self._n = len(self._prices)
+        # Open prices as their own contiguous array, read once per step
+        # float64 so balance and portfolio value keep their precision
+        self._open = self._prices[:, OPEN_COLUMN].astype(np.float64)
         self.initial_balance = initial_balance
         self.transaction_fee = transaction_fee
+        # Logging every transaction is slow, so it's off unless debugging
+        # and the environment logger is enabled for DEBUG
+        self.verbose = verbose
+
+        # Agent uses actions [1, 0, -1], translated to PositionType only when returned, indexed by action + 1
+        self._position_types = (PositionType.SHORT, PositionType.HOLD, PositionType.LONG)
 
-        # Agent uses actions [1, 0, -1] so they have to be translated
-        self.action_mapping = {
-            1: PositionType.LONG,
-            0: PositionType.HOLD,
-            -1: PositionType.SHORT
-        }
-
-        # (agent action, type of open position) -> function
-        # functions open_new_position, buy_more, sell ore not pure as they update position and balance
-        self.action_position_mapping = {
-            ((PositionType.LONG, PositionType.HOLD), (PositionType.SHORT, PositionType.HOLD)): self.open_new_position,
-            ((PositionType.LONG, PositionType.LONG), (PositionType.SHORT, PositionType.SHORT)): self.buy_more,
-            ((PositionType.LONG, PositionType.SHORT), (PositionType.SHORT, PositionType.LONG)): self.sell,
-            ((PositionType.HOLD, PositionType.HOLD), (PositionType.HOLD, PositionType.LONG), (PositionType.HOLD, PositionType.SHORT)): self.hold,
-        }
+        # Balance, portfolio value and action after each step, by step index
+        # Allocated once, reset() doesn't clear them, so only entries up to current_step are valid
+        self.history_balance = np.empty(self._n)
+        self.history_portfolio = np.empty(self._n)
+        self.history_action = np.empty(self._n, dtype=np.int8)
 
         self.reset()
 
     def reset(self):
         self.current_step = 0
-        self.balance = self.initial_balance
-        self.current_state = self.data.iloc[self.current_step, :].values
+        self.balance = float(self.initial_balance)
+        self.current_state = self._prices[self.current_step]
 
-        self.portfolio_value = 0
-        self.position = {'position_type': PositionType.HOLD,
-                         'owned_volume': 0,
-                         'purchase_price': 0}
+        self.portfolio_value = 0.0
+        self.position_type = HOLD
+        self.owned_volume = 0.0
+        self.purchase_price = 0.0
 
     def step(self, action, volume):
-        game_over = False
-        # Convert action to PositionType
-        self.action = self.action_mapping.get(action)
-
-        # Volume can not be 0
-        if ((volume == 0) and (self.action != PositionType.HOLD)):
-            print('Error: Volume cannot be zero for LONG and SHORT.')  # TODO
-            self.action = PositionType.HOLD
-            return game_over, self.balance, self.action
-
-        # Update current state and portfolio value
-        self.current_state = self.data.iloc[self.current_step, :].values
-        # open price from the current state
-        current_price = self.current_state[1]
-        self.portfolio_value = self.update_portfolio_value(current_price)
-
-        # Stop loss check
-        if self.stop_loss(current_price) == True:
-            print('Game over: Stop loss triggered.')
-            self.portfolio_value = self.update_portfolio_value(current_price)
-            game_over = True
-            return game_over, self.balance, self.action
-
-        # Check if the current step should be the last one
-        if self.current_step == (len(self.data) - 1):
-            # Sell everything
-            print('Last iteration. Selling owned position.')
-            self.end_game(current_price)
-            self.portfolio_value = self.update_portfolio_value(current_price)
-            game_over = True
-            print('\nRun Finished.')
-            print(
-                f'Balance: {self.balance}')
-            return game_over, self.balance, self.action
-
-        # Get the function to perform based on action performed by agent and the current position type
-        action_position = (self.action, self.position['position_type'])
-        outcome_function = self.get_action_position_outcome(action_position)
-
-        # Update position and balance
-        outcome_function(action=self.action,
-                         volume=volume,
-                         current_price=current_price)
-
-        # Update portfolio value again
-        self.portfolio_value = self.update_portfolio_value(current_price)
-
-        # Do the step
-        self.current_step += 1
-
-        return game_over, self.balance, self.action
-
-    def get_action_position_outcome(self, action_position):
-        for keys, function in self.action_position_mapping.items():
-            if action_position in keys:
-                return function
-        print('Error: Action position outcome not found.')
-
-    def open_new_position(self, action, volume, current_price):
-        # Check if you can afford this much volume and if not, reduce it
-        cost, volume = self.cost_volume_calculator(volume, current_price)
-
-        if cost == 0:
-            # print('Error: Not enough funds to open position.') # TODO
-            self.action = PositionType.HOLD
-            return
-
-        # Update the balance
-        self.balance -= cost
-
-        # Open a new position
-        self.position = {'position_type': action,
-                         'owned_volume': volume,
-                         'purchase_price': current_price}
-        # Pay transaction fee
-        self.pay_transaction_fee()
-        print(
-            f"Opened new {action.name} position:\nVolume: {volume}\nPurchase Price: {current_price}\nCost: {cost}")
-
-    def buy_more(self, action, volume, current_price):
-        position_type, owned_volume, purchase_price = self.position.values()
-
-        # Check if you can afford this much volume and if not, reduce it
-        cost, volume = self.cost_volume_calculator(volume, current_price)
-
-        if cost == 0:
-            # print('Error: Not enough funds to buy more.') # TODO
-            self.action = PositionType.HOLD
-            return
-
-        self.balance -= cost
-        # Calculate new volume and purchase price and update position
-        new_volume = owned_volume + volume
-        new_purchase_price = np.average(
-            a=[purchase_price, current_price], weights=[owned_volume, volume])
-        self.position = {'position_type': position_type,
-                         'owned_volume': new_volume,
-                         'purchase_price': new_purchase_price}
-        # Pay transaction fee
-        self.pay_transaction_fee()
-        print(
-            f"Bought more {action.name} position:\nAdditional Volume: {volume}\nUpdated Purchase Price: {new_purchase_price}\nCost: {cost}")
-
-    def sell(self, action, volume, current_price):
-        position_type, owned_volume, purchase_price = self.position.values()
-        # Sell some
-        if owned_volume > volume:
-            # Alternative method for calculating outcome (Share of volume to sell in total volume)
-            # sell_to_owned_ratio = volume/owned_volume
-            # outcome = sell_to_owned_ratio * self.portfolio_value
-            # outcome = self.portfolio_value * volume / owned_volume
-            profit_per_share = (self.portfolio_value -
-                                purchase_price * owned_volume)/owned_volume
-            total_profit = profit_per_share * volume
-            outcome = (purchase_price + profit_per_share) * volume
-            # Print status
-            print(
-                f'Sold {owned_volume} shares of {position_type.name} position for {current_price}.\nTotal Transaction Profit: {total_profit}')
-            # Update the balance
-            self.balance += outcome
-            # Calculate how much volume has left
-            remaining_volume = owned_volume - volume
-            # Update position (position type and purchase price stays the same)
-            self.position = {'position_type': position_type,
-                             'owned_volume': remaining_volume,
-                             'purchase_price': purchase_price}
-        # Sell all
-        elif owned_volume <= volume:
-            # Calculate total transaction profit
-            total_profit = self.portfolio_value - owned_volume * purchase_price
-            # Update the balance
-            self.balance += self.portfolio_value
-            # Print status
-            print(
-                f'Sold {volume} shares of {position_type.name} position for {current_price}.\nTotal Transaction Profit: {total_profit}')
-            print('Position closed')
-            # Zero the position
-            self.position = {'position_type': PositionType.HOLD,
-                             'owned_volume': 0,
-                             'purchase_price': 0}
-            # Open reverse if there is some remaining volume
-            if (remaining_volume := volume - owned_volume) > 0:
-                self.open_new_position(action=action,
-                                       volume=remaining_volume,
-                                       current_price=current_price)
-        # Pay transaction fee
-        self.pay_transaction_fee()
-
-    def hold(self, action, volume, current_price):
-        pass
-
-    def pay_transaction_fee(self):
-        self.balance -= self.transaction_fee
-
-    def update_portfolio_value(self, current_price):
-        position_type, owned_volume, purchase_price = self.position.values()
-        if position_type == PositionType.LONG:
-            # Earn when current_price goes up
-            # new_portfolio_value = (purchase_price * owned_volume) + (current_price - purchase_price) * owned_volume
-            new_portfolio_value = current_price * owned_volume
-        elif position_type == PositionType.SHORT:
-            # Earn when price current_price goes down
-            # new_portfolio_value = (purchase_price * owned_volume) + (purchase_price - current_price) * owned_volume
-            new_portfolio_value = 2 * purchase_price * \
-                owned_volume - current_price * owned_volume
-        else:  # position_type == PositionType.HOLD - there is no open position
-            new_portfolio_value = 0
-        return new_portfolio_value
-
-    def stop_loss(self, current_price):
-        if (self.portfolio_value + self.balance <= 0) or (self.balance <= 0):
-            print('Stop loss triggered. Selling position.')
-            print(
-                f'Portfolio value: {self.portfolio_value} | Balance: {self.balance}')
-            # Sell everything
-            self.end_game(current_price)
-            return True
-        else:
-            return False
-
-    def cost_volume_calculator(self, volume, current_price):
-        # Check if you can buy all volume
-        if self.balance >= volume * current_price + self.transaction_fee:
-            return volume * current_price, volume
-        # Buy as much as you can
-        else:
-            # print('Warning: Not enough funds to buy desired volume. Adjusting volume.') # TODO
-            # TODO: Set the parameter for it
-            new_volume = np.floor(
-                ((self.balance - self.transaction_fee) / current_price))
-            return new_volume * current_price, new_volume
-
-    def end_game(self, current_price):
-        position_type, owned_volume, purchase_price = self.position.values()
-        # If you own nothing, do nothing
-        if position_type == PositionType.HOLD:
-            return
-        # If you have anything, sell it all
-        opposite_action = PositionType.SHORT if position_type == PositionType.LONG else PositionType.LONG
-        self.action = opposite_action
-        self.sell(action=opposite_action,
-                  volume=owned_volume,
-                  current_price=current_price)
+        # The compiled core indexes its dispatch table with the action unchecked
+        if action not in (-1, 0, 1):
+            raise ValueError(f'Action must be -1, 0 or 1, got {action}')
+        # Agents may emit float or NumPy actions, the core needs a plain int
+        action = int(action)
+        current_price = self._open[self.current_step]
+        verbose = self.verbose and log.isEnabledFor(logging.DEBUG)
+        if verbose:
+            # Position and balance before the step are only needed for logging
+            previous_position = (self.position_type, self.owned_volume, self.purchase_price, self.balance)
+
+        # Update position, balance and portfolio value in the compiled core
+        (self.balance, self.position_type, self.owned_volume, self.purchase_price,
+         self.portfolio_value, self.action, outcome) = _step_core(
+            self.balance, self.position_type, self.owned_volume, self.purchase_price, self.portfolio_value,
+            action, float(volume), current_price, self.transaction_fee, self.current_step == (self._n - 1))
+
+        if verbose:
+            self.log_outcome(outcome, volume, current_price, previous_position)
+
+        game_over = outcome >= STOP_LOSS
+        if outcome != ZERO_VOLUME:
+            # Update current state and history
+            self.current_state = self._prices[self.current_step]
+            self.history_balance[self.current_step] = self.balance
+            self.history_portfolio[self.current_step] = self.portfolio_value
+            self.history_action[self.current_step] = self.action
+            if not game_over:
+                # Do the step
+                self.current_step += 1
+
+        return game_over, self.balance, self._position_types[self.action + 1]
+
+    def step_many(self, actions, volumes):
+        # Same as calling step for each action and volume, in one compiled loop and without logging
+        # Returns whether the game is over and balance and portfolio value after each step,
+        # cut short when the game gets over
+        actions = np.asarray(actions)
+        volumes = np.asarray(volumes)
+        # _run_episode reads volumes without bounds checks, so there must be one per action
+        if actions.ndim != 1 or actions.shape != volumes.shape:
+            raise ValueError(f'Actions and volumes must be 1-D and of the same length, '
+                             f'got shapes {actions.shape} and {volumes.shape}')
+        if len(actions) == 0:
+            return False, np.empty(0), np.empty(0)
+        # Checked before the int8 cast, which would wrap out of range actions
+        if np.abs(actions).max() > 1:
+            raise ValueError('Actions must be -1, 0 or 1')
+        actions = np.ascontiguousarray(actions, dtype=np.int8)
+        volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+
+        state = (self.balance, self.position_type, self.owned_volume, self.purchase_price, self.portfolio_value)
+        (balance_history, portfolio_history, action_history,
+         state, self.current_step, state_step, game_over) = _run_episode(
+            self._open, actions, volumes, state, self.current_step, self.transaction_fee,
+            self.history_balance, self.history_portfolio, self.history_action)
+        self.balance, self.position_type, self.owned_volume, self.purchase_price, self.portfolio_value = state
+        # Like step, the current state only changes when a step was taken, not on zero volume
+        if state_step >= 0:
+            self.current_state = self._prices[state_step]
+        self.action = int(action_history[-1])
+
+        return game_over, balance_history, portfolio_history
+
+    def log_outcome(self, outcome, volume, current_price, previous_position):
+        position_type, owned_volume, purchase_price, balance = previous_position
+        if outcome == ZERO_VOLUME:
+            log.debug('Error: Volume cannot be zero for LONG and SHORT.')  # TODO
+        elif outcome == STOP_LOSS:
+            log.debug('Stop loss triggered. Selling position.')
+            log.debug('Portfolio value: %s | Balance: %s',
+                      _portfolio_value(position_type, owned_volume, purchase_price, current_price), balance)
+            if position_type != HOLD:
+                self.log_sold(owned_volume, position_type, purchase_price, current_price, closed=True)
+            log.debug('Game over: Stop loss triggered.')
+        elif outcome == LAST_STEP:
+            log.debug('Last iteration. Selling owned position.')
+            if position_type != HOLD:
+                self.log_sold(owned_volume, position_type, purchase_price, current_price, closed=True)
+            log.debug('\nRun Finished.\nBalance: %s', self.balance)
+        elif outcome == OPENED:
+            self.log_opened(current_price)
+        elif outcome == BOUGHT_MORE:
+            added_volume = self.owned_volume - owned_volume
+            log.debug('Bought more %s position:\nAdditional Volume: %s\nUpdated Purchase Price: %s\nCost: %s',
+                      self._position_types[self.position_type + 1].name, added_volume, self.purchase_price,
+                      added_volume * current_price)
+        elif outcome == SOLD_SOME:
+            self.log_sold(volume, position_type, purchase_price, current_price, closed=False)
+        elif outcome in (SOLD_ALL, REVERSED):
+            self.log_sold(owned_volume, position_type, purchase_price, current_price, closed=True)
+            if outcome == REVERSED:
+                self.log_opened(current_price)
+
+    def log_opened(self, current_price):
+        log.debug('Opened new %s position:\nVolume: %s\nPurchase Price: %s\nCost: %s',
+                  self._position_types[self.position_type + 1].name, self.owned_volume, current_price,
+                  self.owned_volume * current_price)
+
+    def log_sold(self, volume, position_type, purchase_price, current_price, closed):
+        log.debug('Sold %s shares of %s position for %s.\nTotal Transaction Profit: %s',
+                  volume, self._position_types[position_type + 1].name, current_price,
+                  volume * position_type * (current_price - purchase_price))
+        if closed:
+            log.debug('Position closed')
+
+    @property
+    def position(self):
+        # Open position in the old dict form, only built when read
+        return {'position_type': PositionType(self.position_type),
+                'owned_volume': self.owned_volume,
+                'purchase_price': self.purchase_price}
 
     def print_status(self):
         print("Current Status:")
         print(f"  Current State: {self.current_state}")
-        print(f"  Open Position: {self.position}")
+        print(f"  Open Position: {PositionType(self.position_type).name} | Volume: {self.owned_volume} | Purchase Price: {self.purchase_price}")
         print(f"  Balance: {self.balance}")
         print(f"  Portfolio Value: {self.portfolio_value}")
         print()
@@ -0,0 +1,13 @@
+# Builds the optional C step kernel used by VecTradingEnvironment:
+# python setup.py build_ext --inplace
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    ext_modules=cythonize(
+        Extension('trading_step',
+                  sources=['trading_step.pyx'],
+                  extra_compile_args=['-O3', '-march=native', '-ffast-math', '-fopenmp'],
+                  extra_link_args=['-fopenmp'])
+    )
+)
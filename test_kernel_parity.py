@@ -0,0 +1,125 @@
+# The step rules are written out again in trading_step.pyx and torch_environment.py,
+# these check that the copies still agree with the Numba kernel on random rollouts
+import numpy as np
+import pandas as pd
+import pytest
+from environment import PRICE_COLUMNS
+from vec_environment import VecTradingEnvironment, _step_kernel
+
+N_ENVS = 64
+N_STEPS = 200
+INITIAL_BALANCE = 1000.0
+TRANSACTION_FEE = 1.0
+
+
+def _random_data(rng):
+    # Random walk that is volatile enough for some sub-envs to hit the stop loss
+    open_prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.05, N_STEPS)))
+    return pd.DataFrame({column: open_prices for column in PRICE_COLUMNS}).astype(np.float32)
+
+
+def _random_rollout(rng):
+    # Zero volumes are included, so the zero-volume path is covered too
+    actions = rng.integers(-1, 2, size=(2 * N_STEPS, N_ENVS)).astype(np.int8)
+    volumes = rng.integers(0, 6, size=(2 * N_STEPS, N_ENVS)).astype(np.float64)
+    return actions, volumes
+
+
+def _initial_state():
+    return {'current_step': np.zeros(N_ENVS, dtype=np.int64),
+            'position_type': np.zeros(N_ENVS, dtype=np.int8),
+            'owned_volume': np.zeros(N_ENVS),
+            'purchase_price': np.zeros(N_ENVS),
+            'balance': np.full(N_ENVS, INITIAL_BALANCE),
+            'portfolio_value': np.zeros(N_ENVS),
+            'done': np.zeros(N_ENVS, dtype=bool)}
+
+
+def _assert_state_equal(expected, actual):
+    for name in ('current_step', 'position_type', 'done'):
+        np.testing.assert_array_equal(np.asarray(actual[name]), expected[name], err_msg=name)
+    for name in ('owned_volume', 'purchase_price', 'balance', 'portfolio_value'):
+        np.testing.assert_allclose(np.asarray(actual[name]), expected[name], rtol=1e-9, atol=1e-6, err_msg=name)
+
+
+def test_c_kernel_matches_numba_kernel():
+    trading_step = pytest.importorskip('trading_step')
+    rng = np.random.default_rng(0)
+    open_prices = np.ascontiguousarray(_random_data(rng)['Open'].to_numpy())
+    actions, volumes = _random_rollout(rng)
+
+    expected, actual = _initial_state(), _initial_state()
+    for step_actions, step_volumes in zip(actions, volumes):
+        expected_action = _step_kernel(
+            open_prices, step_actions, step_volumes, expected['current_step'], expected['position_type'],
+            expected['owned_volume'], expected['purchase_price'], expected['balance'],
+            expected['portfolio_value'], expected['done'], TRANSACTION_FEE, N_STEPS)
+        action = trading_step.step_batch(
+            open_prices, step_actions, step_volumes, actual['current_step'], actual['position_type'],
+            actual['owned_volume'], actual['purchase_price'], actual['balance'],
+            actual['portfolio_value'], actual['done'].view(np.uint8), TRANSACTION_FEE, N_STEPS)
+
+        np.testing.assert_array_equal(np.asarray(action), expected_action)
+        _assert_state_equal(expected, actual)
+    # The rollout is long enough for every sub-env to finish
+    assert expected['done'].all()
+
+
+def test_torch_environment_matches_vec_environment():
+    pytest.importorskip('torch')
+    from torch_environment import TorchTradingEnvironment
+
+    rng = np.random.default_rng(0)
+    data = _random_data(rng)
+    actions, volumes = _random_rollout(rng)
+
+    vec_env = VecTradingEnvironment(data, INITIAL_BALANCE, TRANSACTION_FEE, N_ENVS)
+    torch_env = TorchTradingEnvironment(data, INITIAL_BALANCE, TRANSACTION_FEE, N_ENVS, device='cpu')
+    for step_actions, step_volumes in zip(actions, volumes):
+        expected_done, expected_balance, expected_action = vec_env.step(step_actions, step_volumes)
+        done, balance, action = torch_env.step(step_actions, step_volumes)
+
+        np.testing.assert_array_equal(action.numpy(), expected_action)
+        np.testing.assert_array_equal(done.numpy(), expected_done)
+        np.testing.assert_allclose(balance.numpy(), expected_balance, rtol=1e-9, atol=1e-6)
+        _assert_state_equal(vars(vec_env), {name: value.numpy() for name, value in vars(torch_env).items()
+                                            if name in _initial_state()})
+    assert vec_env.done.all()
+
+
+def test_step_rejects_wrong_lengths():
+    # The kernels don't check bounds, so a length mismatch must be caught before they run
+    env = VecTradingEnvironment(_random_data(np.random.default_rng(0)), INITIAL_BALANCE, TRANSACTION_FEE, 4)
+    with pytest.raises(ValueError):
+        env.step(np.ones(8, dtype=np.int8), np.ones(8))
+    with pytest.raises(ValueError):
+        env.step(np.ones(4, dtype=np.int8), np.ones(1))
+    np.testing.assert_array_equal(env.balance, INITIAL_BALANCE)
+
+
+def test_c_kernel_rejects_wrong_lengths():
+    trading_step = pytest.importorskip('trading_step')
+    open_prices = np.ones(N_STEPS, dtype=np.float32)
+    state = _initial_state()
+    with pytest.raises(ValueError):
+        trading_step.step_batch(
+            open_prices, np.ones(2 * N_ENVS, dtype=np.int8), np.ones(2 * N_ENVS), state['current_step'],
+            state['position_type'], state['owned_volume'], state['purchase_price'], state['balance'],
+            state['portfolio_value'], state['done'].view(np.uint8), TRANSACTION_FEE, N_STEPS)
+
+
+def test_cost_volume_at_exact_multiple():
+    # 1.0 // 0.1 is 9, while floor(1.0 / 0.1) is 10 like in the C and torch kernels
+    from environment import _cost_volume
+    assert _cost_volume(2.0, 100.0, 0.1, 1.0)[1] == 10
+
+
+def test_torch_cost_volume_at_exact_multiple():
+    torch = pytest.importorskip('torch')
+    from torch_environment import TorchTradingEnvironment
+
+    data = _random_data(np.random.default_rng(0))
+    torch_env = TorchTradingEnvironment(data, 2.0, 1.0, 1, device='cpu')
+    _, volume = torch_env.cost_volume_calculator(torch.tensor([100.0], dtype=torch.float64),
+                                                 torch.tensor([0.1], dtype=torch.float64))
+    assert volume.item() == 10
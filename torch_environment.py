@@ -0,0 +1,139 @@
+import numpy as np
+import torch
+from environment import OPEN_COLUMN, PRICE_COLUMNS
+
+
+# VecTradingEnvironment with the state kept in tensors on the GPU, so whole rollouts
+# stay on the device. Position types are ints (LONG=1, HOLD=0, SHORT=-1).
+class TorchTradingEnvironment:
+    def __init__(self, data, initial_balance, transaction_fee, n_envs, device=None):
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+        # Price history is moved to the device once, as float32
+        # Balance and portfolio value are float64 so PnL keeps its precision
+        # Copied, since on the CPU as_tensor would share pandas' read-only buffer
+        self._prices = torch.tensor(
+            data[PRICE_COLUMNS].to_numpy(np.float32), device=self.device)
+        self._n = len(self._prices)
+        self._open = self._prices[:, OPEN_COLUMN].contiguous()
+        self.initial_balance = initial_balance
+        self.transaction_fee = transaction_fee
+        self.n_envs = n_envs
+
+        self.reset()
+
+    def reset(self, n_envs=None):
+        if n_envs is not None:
+            self.n_envs = n_envs
+        n = self.n_envs
+        float64 = dict(dtype=torch.float64, device=self.device)
+
+        self.current_step = torch.zeros(n, dtype=torch.int64, device=self.device)
+        self.balance = torch.full((n,), float(self.initial_balance), **float64)
+        self.current_state = self._prices[self.current_step]
+
+        self.portfolio_value = torch.zeros(n, **float64)
+        self.position_type = torch.zeros(n, dtype=torch.int8, device=self.device)
+        self.owned_volume = torch.zeros(n, **float64)
+        self.purchase_price = torch.zeros(n, **float64)
+        # Sub-envs which already hit the stop loss or the end of data
+        self.done = torch.zeros(n, dtype=torch.bool, device=self.device)
+
+    def step(self, actions, volumes):
+        # Masks are applied with torch.where only, boolean indexing would sync with the host
+        action = torch.as_tensor(actions, device=self.device)
+        # Checked before the int8 cast, which would wrap out of range actions
+        if not torch.all((action >= -1) & (action <= 1)):
+            raise ValueError('Actions must be -1, 0 or 1')
+        action = action.to(torch.int8)
+        volumes = torch.as_tensor(volumes, device=self.device).to(torch.float64)
+        fee = self.transaction_fee
+
+        # Volume can not be 0 - such sub-envs hold and don't advance
+        invalid = ~self.done & (volumes == 0) & (action != 0)
+        action = torch.where(invalid, 0, action).to(torch.int8)
+        live = ~self.done & ~invalid
+
+        # Update current state and portfolio value
+        self.current_state = self._prices[self.current_step]
+        current_price = self._open[self.current_step]
+        self.portfolio_value = torch.where(live,
+                                           self.update_portfolio_value(current_price),
+                                           self.portfolio_value)
+
+        # Stop loss and last iteration both sell everything and end the run
+        stop_loss = live & ((self.portfolio_value + self.balance <= 0) | (self.balance <= 0))
+        last_step = live & (self.current_step == (self._n - 1))
+        closing = stop_loss | last_step
+        closing_open = closing & (self.position_type != 0)
+        action = torch.where(closing_open, -self.position_type, action).to(torch.int8)
+        self.balance = torch.where(closing_open, self.balance + self.portfolio_value - fee, self.balance)
+        self._clear_position(closing)
+        self.portfolio_value = torch.where(closing, 0.0, self.portfolio_value)
+        self.done = self.done | closing
+
+        trading = live & ~closing
+        position_type = self.position_type
+        opening = trading & (position_type == 0) & (action != 0)
+        buying_more = trading & (position_type != 0) & (action == position_type)
+        selling = trading & (position_type != 0) & (action == -position_type)
+
+        # Sell some
+        selling_some = selling & (self.owned_volume > volumes)
+        outcome = self.portfolio_value * volumes / torch.where(selling_some, self.owned_volume, 1.0)
+        self.balance = torch.where(selling_some, self.balance + outcome - fee, self.balance)
+        self.owned_volume = torch.where(selling_some, self.owned_volume - volumes, self.owned_volume)
+
+        # Sell all and open reverse with the remaining volume
+        selling_all = selling & ~selling_some
+        remaining_volume = torch.where(selling_all, volumes - self.owned_volume, 0.0)
+        self.balance = torch.where(selling_all, self.balance + self.portfolio_value, self.balance)
+        self._clear_position(selling_all)
+        reversing = selling_all & (remaining_volume > 0)
+
+        # Open new positions and buy more
+        buying = opening | buying_more | reversing
+        requested_volume = torch.where(reversing, remaining_volume, volumes)
+        cost, volume = self.cost_volume_calculator(requested_volume, current_price)
+        no_funds = buying & (cost == 0)
+        action = torch.where(no_funds, 0, action).to(torch.int8)
+        buying = buying & ~no_funds
+        new_position = buying & ~buying_more
+        buying_more = buying_more & buying
+
+        # A reverse is part of the same trade as the sale, so selling pays the only fee
+        # after the reverse position is opened
+        self.balance = torch.where(buying, self.balance - cost - torch.where(reversing, 0.0, fee), self.balance)
+        self.balance = torch.where(selling_all, self.balance - fee, self.balance)
+        owned_volume = self.owned_volume
+        total_volume = torch.where(buying_more, owned_volume + volume, 1.0)
+        bought_more_price = (self.purchase_price * owned_volume + current_price * volume) / total_volume
+        self.purchase_price = torch.where(new_position, current_price,
+                                          torch.where(buying_more, bought_more_price, self.purchase_price))
+        self.owned_volume = torch.where(new_position, volume,
+                                        torch.where(buying_more, owned_volume + volume, owned_volume))
+        self.position_type = torch.where(new_position, action, self.position_type).to(torch.int8)
+
+        # Update portfolio value again and do the step
+        self.portfolio_value = torch.where(trading,
+                                           self.update_portfolio_value(current_price),
+                                           self.portfolio_value)
+        self.current_step = self.current_step + trading
+
+        return self.done.clone(), self.balance.clone(), action
+
+    def _clear_position(self, mask):
+        self.position_type = torch.where(mask, 0, self.position_type).to(torch.int8)
+        self.owned_volume = torch.where(mask, 0.0, self.owned_volume)
+        self.purchase_price = torch.where(mask, 0.0, self.purchase_price)
+
+    def update_portfolio_value(self, current_price):
+        # LONG earns when price goes up, SHORT when it goes down, HOLD owns nothing
+        return self.owned_volume * (self.purchase_price + self.position_type * (current_price - self.purchase_price))
+
+    def cost_volume_calculator(self, volume, current_price):
+        # Buy as much as you can if you can't afford all volume
+        affordable = self.balance >= volume * current_price + self.transaction_fee
+        volume = torch.where(affordable,
+                             volume,
+                             torch.floor((self.balance - self.transaction_fee) / current_price))
+        return volume * current_price, volume
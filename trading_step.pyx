@@ -0,0 +1,132 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+# C version of the VecTradingEnvironment step kernel
+# Build with: python setup.py build_ext --inplace
+import numpy as np
+from cython.parallel import prange
+from libc.math cimport floor
+
+
+cdef struct Position:
+    signed char position_type
+    double owned_volume
+    double purchase_price
+
+
+cdef inline double portfolio_value(Position position, double current_price) noexcept nogil:
+    # LONG earns when price goes up, SHORT when it goes down, HOLD owns nothing
+    return position.owned_volume * (position.purchase_price
+                                    + position.position_type * (current_price - position.purchase_price))
+
+
+cdef inline double affordable_volume(double balance, double volume, double current_price,
+                                     double transaction_fee) noexcept nogil:
+    # Buy as much as you can if you can't afford all volume
+    if balance < volume * current_price + transaction_fee:
+        return floor((balance - transaction_fee) / current_price)
+    return volume
+
+
+def step_batch(const float[::1] open_prices, const signed char[::1] actions, const double[::1] volumes,
+               long long[::1] current_step, signed char[::1] position_type, double[::1] owned_volume,
+               double[::1] purchase_price, double[::1] balance, double[::1] portfolio_value_out,
+               unsigned char[::1] done, double transaction_fee, long long n_steps):
+    cdef Py_ssize_t n_envs = actions.shape[0]
+    # Bounds checks are off, so every array must have one entry per sub-env
+    if (volumes.shape[0] != n_envs or current_step.shape[0] != n_envs or position_type.shape[0] != n_envs
+            or owned_volume.shape[0] != n_envs or purchase_price.shape[0] != n_envs
+            or balance.shape[0] != n_envs or portfolio_value_out.shape[0] != n_envs or done.shape[0] != n_envs):
+        raise ValueError('All arrays must have the same length as actions')
+    out_actions_array = np.empty(n_envs, dtype=np.int8)
+    cdef signed char[::1] out_actions = out_actions_array
+    cdef Py_ssize_t i
+    cdef long long step
+    cdef signed char action
+    cdef double volume, current_price, bal, pv, cost, remaining_volume
+    cdef Position position
+
+    for i in prange(n_envs, nogil=True):
+        action = actions[i]
+        volume = volumes[i]
+        out_actions[i] = action
+        if done[i]:
+            continue
+        # Volume can not be 0 - hold and don't advance
+        if volume == 0 and action != 0:
+            out_actions[i] = 0
+            continue
+
+        step = current_step[i]
+        position = Position(position_type[i], owned_volume[i], purchase_price[i])
+        bal = balance[i]
+        current_price = open_prices[step]
+        pv = portfolio_value(position, current_price)
+
+        # Stop loss and last iteration both sell everything and end the run
+        if bal <= 0 or pv + bal <= 0 or step == n_steps - 1:
+            if position.position_type != 0:
+                out_actions[i] = -position.position_type
+                bal = bal + pv - transaction_fee
+            position_type[i] = 0
+            owned_volume[i] = 0
+            purchase_price[i] = 0
+            balance[i] = bal
+            portfolio_value_out[i] = 0
+            done[i] = 1
+            continue
+
+        if position.position_type == 0 and action != 0:
+            # Open new position
+            volume = affordable_volume(bal, volume, current_price, transaction_fee)
+            cost = volume * current_price
+            if cost == 0:
+                out_actions[i] = 0
+            else:
+                bal = bal - cost - transaction_fee
+                position.position_type = action
+                position.owned_volume = volume
+                position.purchase_price = current_price
+        elif position.position_type != 0 and action == position.position_type:
+            # Buy more
+            volume = affordable_volume(bal, volume, current_price, transaction_fee)
+            cost = volume * current_price
+            if cost == 0:
+                out_actions[i] = 0
+            else:
+                bal = bal - cost - transaction_fee
+                position.purchase_price = ((position.purchase_price * position.owned_volume + current_price * volume)
+                                           / (position.owned_volume + volume))
+                position.owned_volume = position.owned_volume + volume
+        elif position.position_type != 0 and action == -position.position_type:
+            if position.owned_volume > volume:
+                # Sell some
+                bal = bal + pv * volume / position.owned_volume
+                position.owned_volume = position.owned_volume - volume
+            else:
+                # Sell all and open reverse with the remaining volume
+                bal = bal + pv
+                remaining_volume = volume - position.owned_volume
+                position.position_type = 0
+                position.owned_volume = 0
+                position.purchase_price = 0
+                if remaining_volume > 0:
+                    remaining_volume = affordable_volume(bal, remaining_volume, current_price, transaction_fee)
+                    cost = remaining_volume * current_price
+                    if cost == 0:
+                        out_actions[i] = 0
+                    else:
+                        # The reverse is part of the same trade, the fee below is charged once for both
+                        bal = bal - cost
+                        position.position_type = action
+                        position.owned_volume = remaining_volume
+                        position.purchase_price = current_price
+            bal = bal - transaction_fee
+
+        position_type[i] = position.position_type
+        owned_volume[i] = position.owned_volume
+        purchase_price[i] = position.purchase_price
+        balance[i] = bal
+        # Update portfolio value again and do the step
+        portfolio_value_out[i] = portfolio_value(position, current_price)
+        current_step[i] = step + 1
+
+    return out_actions_array
@@ -0,0 +1,97 @@
+import numpy as np
+from numba import njit, prange
+from environment import _step_core, OPEN_COLUMN, PRICE_COLUMNS, STOP_LOSS, ZERO_VOLUME
+
+try:
+    # Optional C kernel, built with `python setup.py build_ext --inplace`
+    from trading_step import step_batch
+except ImportError:
+    step_batch = None
+
+
+@njit(parallel=True, fastmath=True)
+def _step_kernel(open_prices, actions, volumes, current_step, position_type, owned_volume,
+                 purchase_price, balance, portfolio_value, done, transaction_fee, n_steps):
+    n_envs = len(actions)
+    out_actions = np.empty(n_envs, dtype=np.int8)
+    for i in prange(n_envs):
+        out_actions[i] = actions[i]
+        if done[i]:
+            continue
+
+        # Each sub-env is stepped by the same core as TradingEnvironment
+        step = current_step[i]
+        (new_balance, new_position_type, new_owned_volume, new_purchase_price,
+         new_portfolio_value, action, outcome) = _step_core(
+            balance[i], position_type[i], owned_volume[i], purchase_price[i], portfolio_value[i],
+            actions[i], volumes[i], open_prices[step], transaction_fee, step == n_steps - 1)
+
+        balance[i] = new_balance
+        position_type[i] = new_position_type
+        owned_volume[i] = new_owned_volume
+        purchase_price[i] = new_purchase_price
+        portfolio_value[i] = new_portfolio_value
+        out_actions[i] = action
+        if outcome >= STOP_LOSS:
+            done[i] = True
+        elif outcome != ZERO_VOLUME:
+            current_step[i] = step + 1
+    return out_actions
+
+
+# N independent copies of TradingEnvironment stepped together on the same price history.
+# Position state is kept in shape-(N,) arrays, position types as ints (LONG=1, HOLD=0, SHORT=-1).
+class VecTradingEnvironment:
+    def __init__(self, data, initial_balance, transaction_fee, n_envs):
+        self._prices = np.ascontiguousarray(
+            data[PRICE_COLUMNS].to_numpy(np.float32))
+        self._n = len(self._prices)
+        # Prices are float32, the kernel keeps balance and portfolio value in float64
+        self._open = np.ascontiguousarray(self._prices[:, OPEN_COLUMN])
+        self.initial_balance = initial_balance
+        self.transaction_fee = transaction_fee
+        self.n_envs = n_envs
+
+        self.reset()
+
+    def reset(self, n_envs=None):
+        if n_envs is not None:
+            self.n_envs = n_envs
+        n = self.n_envs
+
+        self.current_step = np.zeros(n, dtype=np.int64)
+        self.balance = np.full(n, self.initial_balance, dtype=np.float64)
+        self.current_state = self._prices[self.current_step]
+
+        self.portfolio_value = np.zeros(n, dtype=np.float64)
+        self.position_type = np.zeros(n, dtype=np.int8)
+        self.owned_volume = np.zeros(n, dtype=np.float64)
+        self.purchase_price = np.zeros(n, dtype=np.float64)
+        # Sub-envs which already hit the stop loss or the end of data
+        self.done = np.zeros(n, dtype=bool)
+
+    def step(self, actions, volumes):
+        actions = np.asarray(actions)
+        volumes = np.asarray(volumes)
+        # The kernels write the state arrays without bounds checks, so lengths must match them
+        if not actions.shape == volumes.shape == (self.n_envs,):
+            raise ValueError(f'Expected {self.n_envs} actions and volumes, '
+                             f'got shapes {actions.shape} and {volumes.shape}')
+        # The kernels index their dispatch on the action unchecked, and the int8 cast would wrap
+        if len(actions) and np.abs(actions).max() > 1:
+            raise ValueError('Actions must be -1, 0 or 1')
+        actions = np.ascontiguousarray(actions, dtype=np.int8)
+        volumes = np.ascontiguousarray(volumes, dtype=np.float64)
+
+        self.current_state = self._prices[self.current_step]
+        # State arrays are updated in place by the compiled kernel
+        if step_batch is not None:
+            action = step_batch(self._open, actions, volumes, self.current_step, self.position_type,
+                                self.owned_volume, self.purchase_price, self.balance, self.portfolio_value,
+                                self.done.view(np.uint8), float(self.transaction_fee), self._n)
+        else:
+            action = _step_kernel(self._open, actions, volumes, self.current_step, self.position_type,
+                                  self.owned_volume, self.purchase_price, self.balance, self.portfolio_value,
+                                  self.done, float(self.transaction_fee), self._n)
+
+        return self.done.copy(), self.balance.copy(), action